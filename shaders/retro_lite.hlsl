@@ -10,14 +10,17 @@ cbuffer PixelShaderSettings : register(b0) {
 };
 
 // ============================================================
-// TUNING CONSTANTS
+// TUNING CONSTANTS (baked in by install_lite_shader)
 // ============================================================
-static const float SCANLINE_DEPTH   = 0.12;  // 0.0 = off, 0.15 = max before text suffers
-static const float VIGNETTE_EXP     = 0.20;  // lower = harder falloff, higher = softer/cinematic
-static const float FLICKER_AMP      = 0.015; // 0.01 = subtle, 0.02 = noticeable
-static const float FLICKER_FREQ     = 1.2;   // 60.0 = mains hum, ~1.2 = slow organic breathe
-static const float BLUR_WEIGHT      = 0.10;  // phosphor neighbor blend, 0.0 = off
-static const float CONTRAST_LIFT    = 0.05;  // slight luma boost to make text pop
+static const min16float SCANLINE_DEPTH  = 0.12;
+static const min16float FLICKER_AMP     = 0.015;
+static const min16float FLICKER_FREQ    = 1.2;
+static const min16float BLUR_WEIGHT     = 0.1;
+static const min16float CONTRAST_LIFT   = 0.05;
+static const min16float VIG_C0          = 0.0558;
+static const min16float VIG_C1          = 1.1749;
+static const min16float VIG_C2          = -0.3219;
+static const min16float VIG_C3          = 0.0913;
 
 float4 main(float4 position : SV_Position, float2 uv : TEXCOORD) : SV_Target {
 
@@ -26,11 +29,15 @@ float4 main(float4 position : SV_Position, float2 uv : TEXCOORD) : SV_Target {
     //    Averages ±1px horizontal neighbors at BLUR_WEIGHT.
     //    Softens glyph edges to read as "old monitor dot pitch"
     //    without reducing legibility — real CRTs were never sharp.
+    //    If this ever grows into a real Gaussian, it has to stay 1D:
+    //    Terminal runs a single pass with no intermediate target, so
+    //    a separable H+V split isn't available and a 2D kernel would
+    //    pay the full NxN tap count.
     // ----------------------------------------------------------
     float2 pixelSize = float2(1.0 / Resolution.x, 0.0);
-    float4 colorL = shaderTexture.Sample(samplerState, uv - pixelSize);
-    float4 colorC = shaderTexture.Sample(samplerState, uv);
-    float4 colorR = shaderTexture.Sample(samplerState, uv + pixelSize);
+    float4 colorL = shaderTexture.SampleLevel(samplerState, uv - pixelSize, 0.0);
+    float4 colorC = shaderTexture.SampleLevel(samplerState, uv, 0.0);
+    float4 colorR = shaderTexture.SampleLevel(samplerState, uv + pixelSize, 0.0);
     float4 color  = colorC * (1.0 - BLUR_WEIGHT) + (colorL + colorR) * (BLUR_WEIGHT * 0.5);
 
     // ----------------------------------------------------------
@@ -38,38 +45,68 @@ float4 main(float4 position : SV_Position, float2 uv : TEXCOORD) : SV_Target {
     //    One dark band per pixel row. Bright pixels (text) punch
     //    through toward full intensity; dark pixels (background)
     //    get the full SCANLINE_DEPTH shadow.
+    //    (A baked 1D scanline LUT would beat the per-pixel sin, but
+    //    Terminal only binds the terminal surface at t0 — there's no
+    //    register to feed a lookup texture into.)
     // ----------------------------------------------------------
-    float scanline = sin(uv.y * Resolution.y * 3.14159265);
-    scanline = 0.5 + 0.5 * scanline;
+    // Luma is linear in color, so blending per-tap lumas with the blur
+    // weights equals taking luma of the blend — and if the blur ever
+    // grows more taps, each one costs a single extra FP16 dot here
+    // instead of a re-derivation from the widened blend.
+    min16float3 lw = min16float3(0.299, 0.587, 0.114);
+    min16float bL = dot((min16float3)colorL.rgb, lw);
+    min16float bC = dot((min16float3)colorC.rgb, lw);
+    min16float bR = dot((min16float3)colorR.rgb, lw);
+    min16float brightness = bC * (1.0 - BLUR_WEIGHT) + (bL + bR) * (BLUR_WEIGHT * 0.5);
 
-    float brightness = dot(color.rgb, float3(0.299, 0.587, 0.114));
-    float scanlineIntensity = lerp(SCANLINE_DEPTH, 0.0, brightness);
-    color.rgb -= scanlineIntensity * scanline;
+    // Saturated pixels take zero shadow (the lerp hits 0 at brightness
+    // 1.0), so skip the band math on bright text entirely. [branch]
+    // stays coherent on a terminal: glyph interiors and background
+    // each take the same side across a wave.
+    [branch] if (brightness < 0.995) {
+        // Triangle wave instead of sin: same one-band-per-two-rows
+        // period and 0..1 range, but three full-rate ALU ops in place
+        // of a per-pixel transcendental.
+        float bandPhase = frac(uv.y * Resolution.y * 0.5);
+        float scanline  = 1.0 - abs(2.0 * bandPhase - 1.0);
 
-    // ----------------------------------------------------------
-    // 3. CONTRAST BOOST
-    //    Slight luma lift so text pops against the scanline shadow.
-    //    The additive term raises midtones without blowing highlights.
-    // ----------------------------------------------------------
-    color.rgb = color.rgb * (1.0 + CONTRAST_LIFT) + (brightness * CONTRAST_LIFT);
+        min16float scanlineIntensity = lerp(SCANLINE_DEPTH, 0.0, brightness);
+        color.rgb -= scanlineIntensity * (min16float)scanline;
+    }
 
     // ----------------------------------------------------------
-    // 4. VIGNETTE
+    // 3. VIGNETTE
     //    Darkens corners to frame the screen. VIGNETTE_EXP controls
     //    how hard the falloff is — lower is more dramatic.
     // ----------------------------------------------------------
-    float vignette = uv.x * uv.y * (1.0 - uv.x) * (1.0 - uv.y);
-    vignette = saturate(pow(16.0 * vignette, VIGNETTE_EXP));
+    float vigRaw = uv.x * uv.y * (1.0 - uv.x) * (1.0 - uv.y);
+    // pow(x, VIGNETTE_EXP) is a log2+exp2 pair per pixel. VIG_C0..C3
+    // are a least-squares cubic in the fourth root, fit from
+    // VIGNETTE_EXP by the installer — error stays within an 8-bit step
+    // over the visible range, and retuning the knob refits them.
+    float v = sqrt(sqrt(saturate(16.0 * vigRaw)));
+    min16float vignette = (min16float)saturate(VIG_C0 + v * (VIG_C1 + v * (VIG_C3 * v + VIG_C2)));
 
     // ----------------------------------------------------------
-    // 5. ORGANIC BREATHE
+    // 4. ORGANIC BREATHE
     //    Slow sinusoidal brightness oscillation. At FLICKER_FREQ ~1.2
     //    it reads as a warm, living phosphor rather than electrical
     //    hum. Raise FLICKER_FREQ to 50.0/60.0 for mains hum character.
     // ----------------------------------------------------------
-    float flicker = 1.0 - FLICKER_AMP + FLICKER_AMP * sin(Time * FLICKER_FREQ);
+    min16float flicker = 1.0 - FLICKER_AMP + FLICKER_AMP * (min16float)sin(Time * FLICKER_FREQ);
 
-    color.rgb *= flicker;
+    // ----------------------------------------------------------
+    // 5. CONTRAST BOOST (FUSED OUTPUT)
+    //    Slight luma lift so text pops against the scanline shadow;
+    //    the additive term raises midtones without blowing highlights.
+    //    Lift, flicker and vignette are all affine in color, so they
+    //    fold into one mad per channel:
+    //      ((c*(1+LIFT) + luma*LIFT) * flicker) * vignette
+    //        == c * scale + bias
+    // ----------------------------------------------------------
+    min16float scale = (1.0 + CONTRAST_LIFT) * flicker * vignette;
+    min16float bias  = brightness * CONTRAST_LIFT * flicker * vignette;
 
-    return float4(saturate(color.rgb * vignette), 1.0);
+    min16float3 outRGB = (min16float3)color.rgb * scale + bias;
+    return float4(saturate(outRGB), 1.0);
 }
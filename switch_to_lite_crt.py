@@ -1,10 +1,35 @@
 import os
-import json
-from pathlib import Path
+from functools import lru_cache
+
+from _wt_common import (
+    find_settings_path,
+    local_app_data,
+    precompile_shader,
+    read_json,
+    write_json,
+)
+
+# Tuning knobs, baked into the shader source at install time so fxc only
+# ever sees literals (everything derived from them constant-folds away).
+DEFAULT_TUNING = {
+    "SCANLINE_DEPTH": 0.12,  # 0.0 = off, 0.15 = max before text suffers
+    "VIGNETTE_EXP": 0.20,    # lower = harder falloff; baked in as fitted VIG_C* coefficients
+    "FLICKER_AMP": 0.015,    # 0.01 = subtle, 0.02 = noticeable
+    "FLICKER_FREQ": 1.2,     # 60.0 = mains hum, ~1.2 = slow organic breathe
+    "BLUR_WEIGHT": 0.10,     # phosphor neighbor blend, 0.0 = off
+    "CONTRAST_LIFT": 0.05,   # slight luma boost to make text pop
+}
+
+# Named variants as tuning overrides on DEFAULT_TUNING. One template +
+# presets-as-data instead of near-identical script copies that drift.
+PRESETS = {
+    "lite": {},
+    "deep": {"SCANLINE_DEPTH": 0.15, "VIGNETTE_EXP": 0.15, "BLUR_WEIGHT": 0.14},
+}
 
 # THE "LITE" SHADER (Final Version)
 # Features: Static Scanlines, Contrast Boost, Vignette, 60Hz Analog Hum
-LITE_SHADER = r"""
+LITE_SHADER_TEMPLATE = r"""
 Texture2D shaderTexture : register(t0);
 SamplerState samplerState : register(s0);
 
@@ -16,14 +41,9 @@ cbuffer PixelShaderSettings : register(b0) {
 };
 
 // ============================================================
-// TUNING CONSTANTS
+// TUNING CONSTANTS (baked in by install_lite_shader)
 // ============================================================
-static const float SCANLINE_DEPTH   = 0.12;  // 0.0 = off, 0.15 = max before text suffers
-static const float VIGNETTE_EXP     = 0.20;  // lower = harder falloff, higher = softer/cinematic
-static const float FLICKER_AMP      = 0.015; // 0.01 = subtle, 0.02 = noticeable
-static const float FLICKER_FREQ     = 1.2;   // 60.0 = mains hum, ~1.2 = slow organic breathe
-static const float BLUR_WEIGHT      = 0.10;  // phosphor neighbor blend, 0.0 = off
-static const float CONTRAST_LIFT    = 0.05;  // slight luma boost to make text pop
+//[TUNING_CONSTANTS]//
 
 float4 main(float4 position : SV_Position, float2 uv : TEXCOORD) : SV_Target {
 
@@ -32,11 +52,15 @@ float4 main(float4 position : SV_Position, float2 uv : TEXCOORD) : SV_Target {
     //    Averages ±1px horizontal neighbors at BLUR_WEIGHT.
     //    Softens glyph edges to read as "old monitor dot pitch"
     //    without reducing legibility — real CRTs were never sharp.
+    //    If this ever grows into a real Gaussian, it has to stay 1D:
+    //    Terminal runs a single pass with no intermediate target, so
+    //    a separable H+V split isn't available and a 2D kernel would
+    //    pay the full NxN tap count.
     // ----------------------------------------------------------
     float2 pixelSize = float2(1.0 / Resolution.x, 0.0);
-    float4 colorL = shaderTexture.Sample(samplerState, uv - pixelSize);
-    float4 colorC = shaderTexture.Sample(samplerState, uv);
-    float4 colorR = shaderTexture.Sample(samplerState, uv + pixelSize);
+    float4 colorL = shaderTexture.SampleLevel(samplerState, uv - pixelSize, 0.0);
+    float4 colorC = shaderTexture.SampleLevel(samplerState, uv, 0.0);
+    float4 colorR = shaderTexture.SampleLevel(samplerState, uv + pixelSize, 0.0);
     float4 color  = colorC * (1.0 - BLUR_WEIGHT) + (colorL + colorR) * (BLUR_WEIGHT * 0.5);
 
     // ----------------------------------------------------------
@@ -44,84 +68,185 @@ float4 main(float4 position : SV_Position, float2 uv : TEXCOORD) : SV_Target {
     //    One dark band per pixel row. Bright pixels (text) punch
     //    through toward full intensity; dark pixels (background)
     //    get the full SCANLINE_DEPTH shadow.
+    //    (A baked 1D scanline LUT would beat the per-pixel sin, but
+    //    Terminal only binds the terminal surface at t0 — there's no
+    //    register to feed a lookup texture into.)
     // ----------------------------------------------------------
-    float scanline = sin(uv.y * Resolution.y * 3.14159265);
-    scanline = 0.5 + 0.5 * scanline;
-
-    float brightness = dot(color.rgb, float3(0.299, 0.587, 0.114));
-    float scanlineIntensity = lerp(SCANLINE_DEPTH, 0.0, brightness);
-    color.rgb -= scanlineIntensity * scanline;
-
-    // ----------------------------------------------------------
-    // 3. CONTRAST BOOST
-    //    Slight luma lift so text pops against the scanline shadow.
-    //    The additive term raises midtones without blowing highlights.
-    // ----------------------------------------------------------
-    color.rgb = color.rgb * (1.0 + CONTRAST_LIFT) + (brightness * CONTRAST_LIFT);
+    // Luma is linear in color, so blending per-tap lumas with the blur
+    // weights equals taking luma of the blend — and if the blur ever
+    // grows more taps, each one costs a single extra FP16 dot here
+    // instead of a re-derivation from the widened blend.
+    min16float3 lw = min16float3(0.299, 0.587, 0.114);
+    min16float bL = dot((min16float3)colorL.rgb, lw);
+    min16float bC = dot((min16float3)colorC.rgb, lw);
+    min16float bR = dot((min16float3)colorR.rgb, lw);
+    min16float brightness = bC * (1.0 - BLUR_WEIGHT) + (bL + bR) * (BLUR_WEIGHT * 0.5);
+
+    // Saturated pixels take zero shadow (the lerp hits 0 at brightness
+    // 1.0), so skip the band math on bright text entirely. [branch]
+    // stays coherent on a terminal: glyph interiors and background
+    // each take the same side across a wave.
+    [branch] if (brightness < 0.995) {
+        // Triangle wave instead of sin: same one-band-per-two-rows
+        // period and 0..1 range, but three full-rate ALU ops in place
+        // of a per-pixel transcendental.
+        float bandPhase = frac(uv.y * Resolution.y * 0.5);
+        float scanline  = 1.0 - abs(2.0 * bandPhase - 1.0);
+
+        min16float scanlineIntensity = lerp(SCANLINE_DEPTH, 0.0, brightness);
+        color.rgb -= scanlineIntensity * (min16float)scanline;
+    }
 
     // ----------------------------------------------------------
-    // 4. VIGNETTE
+    // 3. VIGNETTE
     //    Darkens corners to frame the screen. VIGNETTE_EXP controls
     //    how hard the falloff is — lower is more dramatic.
     // ----------------------------------------------------------
-    float vignette = uv.x * uv.y * (1.0 - uv.x) * (1.0 - uv.y);
-    vignette = saturate(pow(16.0 * vignette, VIGNETTE_EXP));
+    float vigRaw = uv.x * uv.y * (1.0 - uv.x) * (1.0 - uv.y);
+    // pow(x, VIGNETTE_EXP) is a log2+exp2 pair per pixel. VIG_C0..C3
+    // are a least-squares cubic in the fourth root, fit from
+    // VIGNETTE_EXP by the installer — error stays within an 8-bit step
+    // over the visible range, and retuning the knob refits them.
+    float v = sqrt(sqrt(saturate(16.0 * vigRaw)));
+    min16float vignette = (min16float)saturate(VIG_C0 + v * (VIG_C1 + v * (VIG_C3 * v + VIG_C2)));
 
     // ----------------------------------------------------------
-    // 5. ORGANIC BREATHE
+    // 4. ORGANIC BREATHE
     //    Slow sinusoidal brightness oscillation. At FLICKER_FREQ ~1.2
     //    it reads as a warm, living phosphor rather than electrical
     //    hum. Raise FLICKER_FREQ to 50.0/60.0 for mains hum character.
     // ----------------------------------------------------------
-    float flicker = 1.0 - FLICKER_AMP + FLICKER_AMP * sin(Time * FLICKER_FREQ);
+    min16float flicker = 1.0 - FLICKER_AMP + FLICKER_AMP * (min16float)sin(Time * FLICKER_FREQ);
 
-    color.rgb *= flicker;
+    // ----------------------------------------------------------
+    // 5. CONTRAST BOOST (FUSED OUTPUT)
+    //    Slight luma lift so text pops against the scanline shadow;
+    //    the additive term raises midtones without blowing highlights.
+    //    Lift, flicker and vignette are all affine in color, so they
+    //    fold into one mad per channel:
+    //      ((c*(1+LIFT) + luma*LIFT) * flicker) * vignette
+    //        == c * scale + bias
+    // ----------------------------------------------------------
+    min16float scale = (1.0 + CONTRAST_LIFT) * flicker * vignette;
+    min16float bias  = brightness * CONTRAST_LIFT * flicker * vignette;
 
-    return float4(saturate(color.rgb * vignette), 1.0);
+    min16float3 outRGB = (min16float3)color.rgb * scale + bias;
+    return float4(saturate(outRGB), 1.0);
 }
 """
 
-def install_lite_shader():
-    # 1. Write the shader file
-    base_dir = Path(os.environ["LOCALAPPDATA"]) / "nvim/shaders"
-    base_dir.mkdir(parents=True, exist_ok=True)
-    
+@lru_cache(maxsize=8)
+def _fit_vignette_poly(exponent, samples=256):
+    """Least-squares cubic approximating x^exponent in the fourth-root domain.
+
+    A polynomial in x can't follow x^k near 0 (the slope is infinite);
+    in v = x^(1/4) the curve is tame enough that a cubic stays within a
+    fraction of an 8-bit step over the visible range. Returns (c0..c3)
+    for c0 + c1*v + c2*v^2 + c3*v^3.
+    """
+    power = 4.0 * exponent
+    # Sample uniformly in x, not in v: that weights the fit toward the
+    # visible part of the falloff instead of the steep corner at 0.
+    pts = [(i / samples) ** 0.25 for i in range(1, samples + 1)]
+    # Normal equations, solved by Gaussian elimination with pivoting —
+    # a 4x4 system isn't worth a numpy dependency.
+    a = [[sum(v ** (r + c) for v in pts) for c in range(4)] for r in range(4)]
+    b = [sum(v ** (r + power) for v in pts) for r in range(4)]
+    for col in range(4):
+        piv = max(range(col, 4), key=lambda r: abs(a[r][col]))
+        a[col], a[piv] = a[piv], a[col]
+        b[col], b[piv] = b[piv], b[col]
+        for r in range(col + 1, 4):
+            f = a[r][col] / a[col][col]
+            for c in range(col, 4):
+                a[r][c] -= f * a[col][c]
+            b[r] -= f * b[col]
+    coeffs = [0.0] * 4
+    for r in range(3, -1, -1):
+        coeffs[r] = (b[r] - sum(a[r][c] * coeffs[c] for c in range(r + 1, 4))) / a[r][r]
+    return tuple(round(c, 4) for c in coeffs)
+
+
+def render_lite_shader(**overrides):
+    """Returns the shader source with tuning constants baked as literals.
+
+    Keyword overrides replace entries in DEFAULT_TUNING, e.g.
+    render_lite_shader(SCANLINE_DEPTH=0.08).
+    """
+    tuning = {**DEFAULT_TUNING, **overrides}
+    # VIGNETTE_EXP is consumed here, not in the shader: the vignette
+    # polynomial's coefficients are fit from it at render time, so the
+    # knob stays retunable without a hand refit.
+    c0, c1, c2, c3 = _fit_vignette_poly(tuning.pop("VIGNETTE_EXP"))
+    tuning.update({"VIG_C0": c0, "VIG_C1": c1, "VIG_C2": c2, "VIG_C3": c3})
+    # min16float: these are perceptual 0..1 knobs, and FP16-capable
+    # iGPUs run min-precision math at double rate with half the
+    # register pressure.
+    const_lines = "\n".join(
+        f"static const min16float {name:<15} = {float(value)};"
+        for name, value in tuning.items()
+    )
+    return LITE_SHADER_TEMPLATE.replace("//[TUNING_CONSTANTS]//", const_lines)
+
+
+def install_lite_shader(**tuning):
+    # 1. Write the shader file. EAFP: the shaders dir exists on every
+    # run but the first, so try the write directly and only pay the
+    # makedirs walk when it actually fails.
+    base_dir = local_app_data() / "nvim/shaders"
     shader_path = base_dir / "retro_lite.hlsl"
-    shader_path.write_text(LITE_SHADER, encoding="utf-8")
+    source = render_lite_shader(**tuning)
+    try:
+        shader_path.write_text(source, encoding="utf-8")
+    except FileNotFoundError:
+        os.makedirs(base_dir, exist_ok=True)
+        shader_path.write_text(source, encoding="utf-8")
     print(f"✓ Lite Shader written to: {shader_path}")
 
-    # 2. Update Windows Terminal
-    local_app_data = Path(os.environ["LOCALAPPDATA"])
-    wt_paths = [
-        local_app_data / "Packages/Microsoft.WindowsTerminal_8wekyb3d8bbwe/LocalState/settings.json",
-        local_app_data / "Packages/Microsoft.WindowsTerminalPreview_8wekyb3d8bbwe/LocalState/settings.json"
-    ]
-    
-    settings_path = None
-    for p in wt_paths:
-        if p.exists():
-            settings_path = p
-            break
-            
+    # Bytecode next to the source, for Terminal builds that load .cso
+    # directly instead of recompiling the HLSL on every new tab.
+    # pixelShaderPath keeps pointing at the .hlsl — current releases
+    # only accept source, and the .cso sits ready for when they don't.
+    precompile_shader(shader_path)
+
+    # 2. Update Windows Terminal (shared cached lookup)
+    settings_path = find_settings_path()
+
     if settings_path:
-        with open(settings_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = read_json(settings_path)
 
-        updated = False
+        # Normalize once, outside the loop — as_posix gives the forward
+        # slashes WT wants without rescanning the string per profile
+        desired = {
+            "experimental.pixelShaderPath": shader_path.as_posix(),
+            "experimental.retroTerminalEffect": False,
+        }
+
+        matched = False
+        changed = False
         for profile in data['profiles']['list']:
             if "PowerShell" in profile.get('name', ''):
-                profile["experimental.pixelShaderPath"] = str(shader_path).replace("\\", "/")
-                profile["experimental.retroTerminalEffect"] = False
-                updated = True
-
-        if updated:
-            with open(settings_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=4)
+                matched = True
+                for key, value in desired.items():
+                    if profile.get(key) != value:
+                        profile[key] = value
+                        changed = True
+
+        if changed:
+            write_json(settings_path, data)
             print("✓ Settings updated! The terminal is now alive.")
+        elif matched:
+            print("✓ Settings already point at the lite shader.")
         else:
             print("! PowerShell profile not found.")
     else:
         print("! Settings.json not found.")
 
 if __name__ == "__main__":
-    install_lite_shader()
+    import sys
+
+    preset = sys.argv[1] if len(sys.argv) > 1 else "lite"
+    if preset not in PRESETS:
+        print(f"Unknown preset '{preset}'. Options: {', '.join(PRESETS)}")
+        sys.exit(1)
+    install_lite_shader(**PRESETS[preset])
@@ -1,55 +1,47 @@
-import json
-import os
-from pathlib import Path
+from _wt_common import find_settings_path, read_json, write_json
 
 def switch_to_native_retro():
-    # 1. Find the settings file
-    local = Path(os.environ["LOCALAPPDATA"])
-    paths = [
-        local / "Packages/Microsoft.WindowsTerminal_8wekyb3d8bbwe/LocalState/settings.json",
-        local / "Packages/Microsoft.WindowsTerminalPreview_8wekyb3d8bbwe/LocalState/settings.json"
-    ]
-    
-    settings_path = None
-    for p in paths:
-        if p.exists():
-            settings_path = p
-            break
-            
+    # 1. Find the settings file (shared cached lookup)
+    settings_path = find_settings_path()
+
     if not settings_path:
         print("Could not find Windows Terminal settings.")
         return
 
     # 2. Load Data
-    with open(settings_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    data = read_json(settings_path)
 
     # 3. Modify Profiles
     profiles = data.get('profiles', {})
     p_list = profiles.get('list', []) if isinstance(profiles, dict) else profiles
 
+    # What "native retro" means for a profile. Diffed rather than
+    # blindly assigned so a second run skips the reserialize + write.
+    desired = {
+        "experimental.pixelShaderPath": "",      # clear the custom shader (removes the stripes)
+        "experimental.retroTerminalEffect": True,  # built-in CRT effect
+        "opacity": 85,                           # transparency stays on
+        "useAcrylic": True,
+    }
+
+    matched = False
     updated = False
     for profile in p_list:
         # Target your PowerShell profile(s)
         if "PowerShell" in profile.get('name', ''):
-            # CLEAR the custom shader path (removes the stripes)
-            profile["experimental.pixelShaderPath"] = "" 
-            
-            # ENABLE the built-in CRT effect
-            profile["experimental.retroTerminalEffect"] = True
-            
-            # Ensure transparency stays on
-            profile["opacity"] = 85 
-            profile["useAcrylic"] = True
-            
-            updated = True
-
-    # 4. Save
+            matched = True
+            for key, value in desired.items():
+                if profile.get(key) != value:
+                    profile[key] = value
+                    updated = True
+
+    # 4. Save — only when something actually differed
     if updated:
-        with open(settings_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=4)
+        write_json(settings_path, data)
         print(f"✓ Reverted to Native Retro CRT effect in: {settings_path.name}")
         print("  (Stripes removed, readability restored)")
+    elif matched:
+        print("✓ Already on the native retro effect; nothing to write.")
     else:
         print("No PowerShell profile found to update.")
 
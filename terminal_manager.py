@@ -1,32 +1,48 @@
-import json
-import os
-from pathlib import Path
+import hashlib
+
+from _wt_common import dumps_json, find_settings_path, loads_json, write_bytes_atomic
 
 class TerminalManager:
+    # Fixed attribute set: drops the per-instance __dict__ and makes
+    # attribute access a direct slot load for batch-configuration loops.
+    __slots__ = ("path", "data", "_load_hash", "_profiles", "_names")
+
     def __init__(self):
         self.path = self._find_settings_path()
         self.data = self._load_settings()
 
     def _find_settings_path(self):
         """Locates the active Windows Terminal settings file."""
-        local = Path(os.environ["LOCALAPPDATA"])
-        paths = [
-            local / "Packages/Microsoft.WindowsTerminal_8wekyb3d8bbwe/LocalState/settings.json",
-            local / "Packages/Microsoft.WindowsTerminalPreview_8wekyb3d8bbwe/LocalState/settings.json"
-        ]
-        for p in paths:
-            if p.exists():
-                return p
-        raise FileNotFoundError("Could not locate Windows Terminal settings.json")
+        path = find_settings_path()
+        if path is None:
+            raise FileNotFoundError("Could not locate Windows Terminal settings.json")
+        return path
 
     def _load_settings(self):
-        with open(self.path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        raw = self.path.read_bytes()
+        # Remember what's on disk so save() can skip no-op rewrites
+        self._load_hash = hashlib.blake2b(raw, digest_size=8).digest()
+        data = loads_json(raw)
+        # Resolve the profile list once at load. The dicts are shared
+        # references into data, so edits through here still serialize —
+        # update_profile never re-walks the settings tree per call.
+        profiles = data.get('profiles', {})
+        self._profiles = profiles.get('list', []) if isinstance(profiles, dict) else []
+        # Names-only sidecar list: update_profile scans this flat list
+        # instead of paying a dict lookup + casefold per profile per call
+        self._names = [p.get('name', '').casefold() for p in self._profiles]
+        return data
 
     def save(self):
-        """Commits changes to disk."""
-        with open(self.path, 'w', encoding='utf-8') as f:
-            json.dump(self.data, f, indent=4)
+        """Commits changes to disk, skipping the write when nothing changed."""
+        raw = dumps_json(self.data)
+        new_hash = hashlib.blake2b(raw, digest_size=8).digest()
+        if new_hash == self._load_hash:
+            print(f"✓ Terminal settings already current at {self.path.name}")
+            return
+
+        write_bytes_atomic(self.path, raw)
+        self._load_hash = new_hash
         print(f"✓ Terminal settings updated at {self.path.name}")
 
     def update_profile(self, name_query="PowerShell", **kwargs):
@@ -35,14 +51,15 @@ class TerminalManager:
         Usage: manager.update_profile("PowerShell", opacity=50, cursorShape="bar")
         """
         updated = False
-        # profiles can be a list or a dict with a 'list' key
-        profiles = self.data.get('profiles', {})
-        profile_list = profiles.get('list', []) if isinstance(profiles, dict) else []
-
-        for profile in profile_list:
-            if name_query.lower() in profile.get('name', '').lower():
+        needle = name_query.casefold()
+        for i, name in enumerate(self._names):
+            if needle in name:
+                profile = self._profiles[i]
                 for key, value in kwargs.items():
                     profile[key] = value
+                if 'name' in kwargs:
+                    # Keep the sidecar honest when a rename comes through here
+                    self._names[i] = profile.get('name', '').casefold()
                 updated = True
         
         if updated: